@@ -32,6 +32,7 @@ LIST_TASKS_ONLY=false
 SELECTED_TASKS=""
 APPROVED_TASKS=""
 SKIPPED_TASKS=""
+BATCH_MODE=false
 CACHE_DIR=".universal-ci-cache"
 
 # Print usage
@@ -52,6 +53,7 @@ usage() {
     echo "  --select-tasks     JSON array of task names to run (e.g., '[\"task1\",\"task2\"]')"
     echo "  --approve-task     Approve a task requiring approval (can be used multiple times)"
     echo "  --skip-task        Skip a task by name (can be used multiple times)"
+    echo "  --batch            Verify each directory read from stdin in turn, printing ===END:<code>=== after each"
     echo "  --help             Show this help message"
     echo ""
     echo "Examples:"
@@ -110,6 +112,10 @@ while [ $# -gt 0 ]; do
             fi
             shift 2
             ;;
+        --batch)
+            BATCH_MODE=true
+            shift
+            ;;
         --help|-h)
             usage
             ;;
@@ -800,4 +806,21 @@ if [ "$INIT_MODE" = true ]; then
     run_init
 fi
 
+# Batch mode: verify every directory listed on stdin from this one process,
+# one after another. Each runs in a subshell (so main's exit doesn't end the
+# batch) with its stderr folded into its stdout, followed by its exit code.
+# Exits non-zero if any directory failed; callers wanting concurrency can run
+# several batches side by side
+if [ "$BATCH_MODE" = true ]; then
+    batch_status=0
+    while IFS= read -r batch_dir; do
+        [ -z "$batch_dir" ] && continue
+        (cd "$batch_dir" && main < /dev/null) 2>&1
+        batch_rc=$?
+        echo "===END:$batch_rc==="
+        [ "$batch_rc" -ne 0 ] && batch_status=1
+    done
+    exit "$batch_status"
+fi
+
 main
\ No newline at end of file
@@ -4,14 +4,97 @@ Universal CI Test Suite
 Tests detection, config generation, and verification for all supported languages.
 """
 
+import argparse
 import os
 import sys
 import json
+import re
 import subprocess
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # Optional - fall back to the stdlib parser
+    _loads = json.loads
+
+try:
+    import jsonschema
+except ImportError:  # Optional - fall back to a structural check without it
+    jsonschema = None
+
+CONFIG_FILE = "universal-ci.config.json"
+
+# Minimal shape every universal-ci.config.json must have
+CONFIG_SCHEMA = {
+    "type": "object",
+    "required": ["tasks"],
+    "properties": {"tasks": {"type": "array"}},
+}
+
+# Every top-level sentinel name in a single alternation; the matching group
+# names the project type it indicates ("_" stands in for "-"). A top-level
+# src directory is matched too so src/main/{scala,kotlin} can be checked.
+DETECTION_RE = re.compile(
+    r"^(?:(?P<nodejs>package\.json)"
+    r"|(?P<python>pyproject\.toml|requirements\.txt)"
+    r"|(?P<go>go\.mod)"
+    r"|(?P<rust>Cargo\.toml)"
+    r"|(?P<dotnet>.+\.(?:cs|fs)proj)"
+    r"|(?P<java_maven>pom\.xml)"
+    r"|(?P<scala>build\.sbt)"
+    r"|(?P<java_gradle>build\.gradle(?:\.kts)?)"
+    r"|(?P<swift>Package\.swift)"
+    r"|(?P<cpp>CMakeLists\.txt|.+\.(?:cpp|cc))"
+    r"|(?P<dart>pubspec\.yaml|.+\.dart)"
+    r"|(?P<ruby>Gemfile)"
+    r"|(?P<php>composer\.json)"
+    r"|(?P<make>Makefile)"
+    r"|(?P<src>src))$"
+)
+
+# Detection priority when a fixture matches several project types
+DETECTION_PRIORITY = [
+    "nodejs", "python", "go", "rust", "dotnet", "java_maven", "scala", "kotlin",
+    "java_gradle", "swift", "cpp", "dart", "ruby", "php", "make",
+]
+
+
+def _detect_project_type(fixture_path: Path, entries: Set[str]) -> str:
+    """Detect a project type from the fixture's top-level entry names."""
+    hits = set()
+    for name in entries:
+        match = DETECTION_RE.match(name)
+        if match:
+            hits.add(match.lastgroup)
+
+    # Nested probes are only stat'ed when there is a top-level src entry
+    if "src" in hits:
+        if (fixture_path / "src/main/scala").exists():
+            hits.add("scala")
+        if (fixture_path / "src/main/kotlin").exists():
+            hits.add("kotlin")
+
+    detected = next((group for group in DETECTION_PRIORITY if group in hits), "generic")
+    return detected.replace("_", "-")
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """Hardlink a fixture file instead of copying it, falling back to a real copy."""
+    if os.name == "nt":
+        return shutil.copy2(src, dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Hardlinks fail across filesystems (e.g. tmpfs temp dirs)
+        return shutil.copy2(src, dst)
+    return dst
+
 
 class UniversalCITester:
     """Test suite for Universal CI functionality."""
@@ -42,91 +125,119 @@ class UniversalCITester:
             "generic_project": "generic"
         }
 
+        # Compile the config schema once and reuse it for every fixture
+        self._validator = jsonschema.Draft7Validator(CONFIG_SCHEMA) if jsonschema else None
+
+        # Per-fixture directory listing and config, filled once by _scan_fixtures()
+        self._fixture_cache: Optional[Dict[str, Dict[str, Any]]] = None
+
     def run_command(self, cmd: List[str], cwd: Optional[str] = None,
-                   env: Optional[Dict[str, str]] = None) -> Tuple[int, str, str]:
+                   env: Optional[Dict[str, str]] = None,
+                   input: Optional[str] = None) -> Tuple[int, str, str]:
         """Run a command and return (exit_code, stdout, stderr)."""
         result = subprocess.run(
             cmd,
             cwd=cwd or str(self.repo_root),
             env=env,
+            input=input,
             capture_output=True,
             text=True
         )
         return result.returncode, result.stdout, result.stderr
 
-    def test_project_detection(self) -> bool:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _load_config(path_str: str) -> dict:
+        """Parse a fixture config, caching the result for the rest of the run."""
+        return _loads(Path(path_str).read_bytes())
+
+    def _scan_fixtures(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Scan every existing fixture once and cache its top-level entry names,
+        parsed config (None if absent) and config parse error, if any.
+        Fixtures don't change during a run, so all test phases share this.
+        """
+        if self._fixture_cache is None:
+            cache = {}
+            for fixture_name in self.project_types:
+                fixture_path = self.fixtures_dir / fixture_name
+                if not fixture_path.is_dir():
+                    continue
+
+                entries = {entry.name for entry in os.scandir(fixture_path)}
+                config, config_error = None, None
+                if CONFIG_FILE in entries:
+                    try:
+                        config = self._load_config(str(fixture_path / CONFIG_FILE))
+                    except json.JSONDecodeError as e:
+                        config_error = e
+
+                cache[fixture_name] = {
+                    "entries": entries,
+                    "config": config,
+                    "config_error": config_error,
+                }
+            self._fixture_cache = cache
+        return self._fixture_cache
+
+    def _config_errors(self, config) -> List[str]:
+        """Return schema violations for a parsed config (empty if valid)."""
+        if self._validator is not None:
+            return [error.message for error in self._validator.iter_errors(config)]
+
+        if not isinstance(config, dict) or 'tasks' not in config:
+            return ["missing 'tasks' key"]
+        if not isinstance(config['tasks'], list):
+            return ["'tasks' is not an array"]
+        return []
+
+    def test_project_detection(self, fail_fast: bool = False) -> bool:
         """Test that project type detection works for all fixtures."""
         print("🧪 Testing project detection...")
 
         all_passed = True
+        fixtures = self._scan_fixtures()
 
         for fixture_name, expected_type in self.project_types.items():
-            fixture_path = self.fixtures_dir / fixture_name
+            fixture = fixtures.get(fixture_name)
 
-            if not fixture_path.exists():
+            if fixture is None:
                 print(f"  ❌ Fixture missing: {fixture_name}")
                 all_passed = False
+                if fail_fast:
+                    return False
                 continue
 
             # Test detection by checking for key files that should trigger detection
             # This avoids running install-ci.sh which executes commands
-            detected_type = None
-
-            # Check for language-specific files
-            if (fixture_path / "package.json").exists():
-                detected_type = "nodejs"
-            elif (fixture_path / "pyproject.toml").exists() or (fixture_path / "requirements.txt").exists():
-                detected_type = "python"
-            elif (fixture_path / "go.mod").exists():
-                detected_type = "go"
-            elif (fixture_path / "Cargo.toml").exists():
-                detected_type = "rust"
-            elif list(fixture_path.glob("*.csproj")) or list(fixture_path.glob("*.fsproj")):
-                detected_type = "dotnet"
-            elif (fixture_path / "pom.xml").exists():
-                detected_type = "java-maven"
-            elif (fixture_path / "build.sbt").exists() or (fixture_path / "src/main/scala").exists():
-                detected_type = "scala"
-            elif (fixture_path / "src/main/kotlin").exists():
-                detected_type = "kotlin"
-            elif (fixture_path / "build.gradle").exists() or (fixture_path / "build.gradle.kts").exists():
-                detected_type = "java-gradle"
-            elif (fixture_path / "Package.swift").exists():
-                detected_type = "swift"
-            elif (fixture_path / "CMakeLists.txt").exists() or list(fixture_path.glob("*.cpp")) or list(fixture_path.glob("*.cc")):
-                detected_type = "cpp"
-            elif (fixture_path / "pubspec.yaml").exists() or list(fixture_path.glob("*.dart")):
-                detected_type = "dart"
-            elif (fixture_path / "Gemfile").exists():
-                detected_type = "ruby"
-            elif (fixture_path / "composer.json").exists():
-                detected_type = "php"
-            elif (fixture_path / "Makefile").exists():
-                detected_type = "make"
-            else:
-                detected_type = "generic"
+            detected_type = _detect_project_type(self.fixtures_dir / fixture_name,
+                                                 fixture["entries"])
 
             if detected_type == expected_type:
                 print(f"  ✅ {fixture_name}: Detected as {expected_type}")
             else:
                 print(f"  ❌ {fixture_name}: Expected {expected_type}, got {detected_type}")
                 all_passed = False
+                if fail_fast:
+                    return False
 
         return all_passed
 
-    def test_config_generation(self) -> bool:
+    def test_config_generation(self, fail_fast: bool = False) -> bool:
         """Test that generated configs match expected fixtures."""
         print("🧪 Testing config generation...")
 
         all_passed = True
+        fixtures = self._scan_fixtures()
 
         for fixture_name, expected_type in self.project_types.items():
-            fixture_path = self.fixtures_dir / fixture_name
-            expected_config = fixture_path / "universal-ci.config.json"
+            fixture = fixtures.get(fixture_name)
 
-            if not expected_config.exists():
+            if fixture is None or CONFIG_FILE not in fixture["entries"]:
                 print(f"  ❌ {fixture_name}: Expected config missing")
                 all_passed = False
+                if fail_fast:
+                    return False
                 continue
 
             # For this test, we'll manually check what the install-ci.sh would generate
@@ -134,102 +245,137 @@ class UniversalCITester:
             # This avoids executing potentially failing commands
 
             # Read the expected config
-            try:
-                with open(expected_config, 'r') as f:
-                    expected = json.load(f)
-            except json.JSONDecodeError as e:
-                print(f"  ❌ {fixture_name}: Invalid expected config JSON: {e}")
+            if fixture["config_error"] is not None:
+                print(f"  ❌ {fixture_name}: Invalid expected config JSON: {fixture['config_error']}")
                 all_passed = False
+                if fail_fast:
+                    return False
                 continue
 
+            expected = fixture["config"]
+
             # For now, just check that the expected config is valid JSON
             # In a real implementation, we'd mock the command execution
-            if not isinstance(expected, dict) or 'tasks' not in expected:
-                print(f"  ❌ {fixture_name}: Expected config missing 'tasks' key")
+            errors = self._config_errors(expected)
+            if errors:
+                print(f"  ❌ {fixture_name}: Expected config invalid: {'; '.join(errors)}")
                 all_passed = False
+                if fail_fast:
+                    return False
                 continue
 
             print(f"  ✅ {fixture_name}: Config structure valid")
 
         return all_passed
 
-    def test_verification_execution(self) -> bool:
-        """Test that verification can execute tasks (without actually running them)."""
-        print("🧪 Testing verification execution...")
-
+    def _report_results(self, results: List[Tuple[str, bool, str]],
+                        fail_fast: bool = False) -> bool:
+        """Print per-fixture results in fixture order and return overall status."""
         all_passed = True
+        for fixture_name, passed, message in results:
+            print(message)
+            if not passed:
+                all_passed = False
+                if fail_fast:
+                    return False
 
-        for fixture_name, expected_type in self.project_types.items():
-            fixture_path = self.fixtures_dir / fixture_name
-
-            if not fixture_path.exists():
-                continue
-
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Copy fixture to temp directory
-                temp_fixture = Path(temp_dir) / fixture_name
-                shutil.copytree(fixture_path, temp_fixture)
+        return all_passed
 
-                # Run run-ci.sh --help to test basic functionality
-                cmd = ["bash", str(self.verify_script), "--help"]
-                exit_code, stdout, stderr = self.run_command(cmd, cwd=str(temp_fixture))
+    def test_verification_execution(self, fail_fast: bool = False) -> bool:
+        """Test that verification can execute tasks (without actually running them)."""
+        print("🧪 Testing verification execution...")
 
-                if exit_code != 0:
-                    print(f"  ❌ {fixture_name}: Verify script failed (exit {exit_code})")
-                    print(f"     Error: {stderr.strip()}")
-                    all_passed = False
-                    continue
+        # --help output doesn't depend on the working directory, so run it once
+        # and check the same output against every fixture
+        cmd = ["bash", str(self.verify_script), "--help"]
+        exit_code, stdout, stderr = self.run_command(cmd)
 
-                # Check that help output contains expected content
-                if "Universal CI Verifier" not in stdout:
-                    print(f"  ❌ {fixture_name}: Unexpected help output")
-                    all_passed = False
-                    continue
+        fixtures = self._scan_fixtures()
+        results = []
+        for fixture_name in self.project_types:
+            if fixture_name not in fixtures:
+                continue
 
-                print(f"  ✅ {fixture_name}: Verification script functional")
+            if exit_code != 0:
+                results.append((fixture_name, False,
+                                f"  ❌ {fixture_name}: Verify script failed (exit {exit_code})\n"
+                                f"     Error: {stderr.strip()}"))
+            elif "Universal CI Verifier" not in stdout:
+                results.append((fixture_name, False,
+                                f"  ❌ {fixture_name}: Unexpected help output"))
+            else:
+                results.append((fixture_name, True,
+                                f"  ✅ {fixture_name}: Verification script functional"))
 
-        return all_passed
+        return self._report_results(results, fail_fast)
 
-    def test_task_parsing(self) -> bool:
+    def test_task_parsing(self, fail_fast: bool = False) -> bool:
         """Test that run-ci.sh can parse tasks from config files."""
         print("🧪 Testing task parsing...")
 
-        all_passed = True
+        fixtures = self._scan_fixtures()
+        fixture_names = [
+            name for name in self.project_types
+            if name in fixtures and CONFIG_FILE in fixtures[name]["entries"]
+        ]
 
-        for fixture_name, expected_type in self.project_types.items():
-            fixture_path = self.fixtures_dir / fixture_name
-            config_file = fixture_path / "universal-ci.config.json"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Give each fixture an empty working directory holding only a link to
+            # its config: run-ci.sh only needs the config to parse tasks, and the
+            # task runs (which write caches and build output) stay out of the fixtures
+            temp_fixtures = []
+            for fixture_name in fixture_names:
+                temp_fixture = Path(temp_dir) / fixture_name
+                temp_fixture.mkdir()
+                _link_or_copy(str(self.fixtures_dir / fixture_name / CONFIG_FILE),
+                              str(temp_fixture / CONFIG_FILE))
+                temp_fixtures.append(str(temp_fixture))
+
+            # run-ci.sh --batch verifies its directories one after another, keeping
+            # each fixture's stdout and stderr together; run one batch per CPU
+            # over contiguous slices of the fixtures so they still run concurrently
+            # (they will fail on actual commands but should parse correctly)
+            cmd = ["bash", str(self.verify_script), "--batch"]
+            workers = max(1, min(len(temp_fixtures), os.cpu_count() or 1))
+            size = -(-len(temp_fixtures) // workers)
+            batches = [temp_fixtures[i:i + size] for i in range(0, len(temp_fixtures), size)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                stdouts = list(executor.map(
+                    lambda batch: self.run_command(cmd, input="\n".join(batch) + "\n")[1],
+                    batches
+                ))
+
+        # Each batch prints <fixture output>===END:<code>=== per fixture, in input order
+        outputs = []
+        for batch, stdout in zip(batches, stdouts):
+            outputs.extend(re.split(r"===END:\d+===\n", stdout)[:len(batch)])
 
-            if not config_file.exists():
+        results = []
+        for index, fixture_name in enumerate(fixture_names):
+            output = outputs[index] if index < len(outputs) else ""
+
+            # We expect this to fail because the actual commands won't work in test environment
+            # But it should at least start parsing and show the tasks
+            if "Starting Universal CI Verification" not in output:
+                # Each fixture's output already includes its own stderr
+                results.append((fixture_name, False,
+                                f"  ❌ {fixture_name}: Task parsing failed\n"
+                                f"     Output: {output.strip()}"))
                 continue
 
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Copy fixture to temp directory
-                temp_fixture = Path(temp_dir) / fixture_name
-                shutil.copytree(fixture_path, temp_fixture)
-
-                # Try to run verification (it will fail on actual commands but should parse correctly)
-                cmd = ["bash", str(self.verify_script)]
-                exit_code, stdout, stderr = self.run_command(cmd, cwd=str(temp_fixture))
-
-                # We expect this to fail because the actual commands won't work in test environment
-                # But it should at least start parsing and show the tasks
-                if "Starting Universal CI Verification" not in stdout:
-                    print(f"  ❌ {fixture_name}: Task parsing failed")
-                    print(f"     Stdout: {stdout.strip()}")
-                    print(f"     Stderr: {stderr.strip()}")
-                    all_passed = False
-                    continue
+            results.append((fixture_name, True,
+                            f"  ✅ {fixture_name}: Tasks parsed successfully"))
 
-                print(f"  ✅ {fixture_name}: Tasks parsed successfully")
+        return self._report_results(results, fail_fast)
 
-        return all_passed
-
-    def run_all_tests(self) -> bool:
-        """Run all test suites."""
+    def run_all_tests(self, fail_fast: bool = False) -> bool:
+        """Run all test suites, stopping at the first failure if fail_fast is set."""
         print("🚀 Starting Universal CI Test Suite")
         print("=" * 50)
 
+        # Scan fixtures up front; every test phase below reads from this cache
+        self._scan_fixtures()
+
         tests = [
             ("Project Detection", self.test_project_detection),
             ("Config Generation", self.test_config_generation),
@@ -241,8 +387,10 @@ class UniversalCITester:
         for test_name, test_func in tests:
             print(f"\n🔬 Running {test_name} Tests")
             print("-" * 30)
-            passed = test_func()
+            passed = test_func(fail_fast)
             results.append((test_name, passed))
+            if fail_fast and not passed:
+                break
 
         print("\n" + "=" * 50)
         print("📊 TEST RESULTS SUMMARY")
@@ -266,6 +414,11 @@ class UniversalCITester:
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description='Universal CI Test Suite')
+    parser.add_argument('--fail-fast', action='store_true',
+                        help='Stop at the first failing fixture')
+    args = parser.parse_args()
+
     # Find repo root - start from current file's directory and go up
     current_dir = Path(__file__).parent
     
@@ -289,7 +442,7 @@ def main():
 
     # Run tests
     tester = UniversalCITester(str(repo_root))
-    success = tester.run_all_tests()
+    success = tester.run_all_tests(fail_fast=args.fail_fast)
 
     sys.exit(0 if success else 1)
 
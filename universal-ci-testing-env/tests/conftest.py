@@ -0,0 +1,76 @@
+"""
+Shared fixtures for the universal-ci test suite.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from helpers import init_git_repo
+
+
+DUMMY_VERIFY_SCRIPT = """#!/bin/sh
+# Dummy verify script that can fail
+exit $VERIFY_EXIT_CODE
+"""
+
+
+@pytest.fixture(scope="session")
+def git_repo_template(tmp_path_factory) -> Path:
+    """A git repo with a dummy run-ci.sh, built once per session."""
+    template = tmp_path_factory.mktemp("git_repo_template")
+    init_git_repo(template)
+    
+    verify_script = template / "run-ci.sh"
+    verify_script.write_text(DUMMY_VERIFY_SCRIPT)
+    verify_script.chmod(0o755)
+    return template
+
+
+@pytest.fixture(scope="class")
+def class_tmp(tmp_path_factory) -> Path:
+    """One temp directory shared by a test class; tests use a subdirectory each."""
+    return tmp_path_factory.mktemp("class")
+
+
+@pytest.fixture
+def repo_path(git_repo_template, class_tmp, request) -> Path:
+    """A fresh copy of the template repo for a single test."""
+    repo = class_tmp / request.node.name
+    shutil.copytree(git_repo_template, repo, symlinks=True)
+    return repo
+
+
+@pytest.fixture(scope="session")
+def install_hook(tmp_path_factory):
+    """
+    Install a hook script at a path as a symlink to a copy written once per
+    session. Falls back to writing the file directly where symlinks aren't
+    available (Windows without the privilege).
+    """
+    hooks = tmp_path_factory.mktemp("hooks")
+    
+    def install(path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        script = hooks / hashlib.sha1(content).hexdigest()
+        if not script.exists():
+            script.write_bytes(content)
+            script.chmod(0o755)
+        
+        # Writing through an existing symlink would clobber the shared script
+        if path.is_symlink() or path.exists():
+            path.unlink()
+        try:
+            os.symlink(script, path)
+            return
+        except (NotImplementedError, OSError):
+            # Only Windows can lack symlink support (or the privilege for it)
+            if os.name != "nt":
+                raise
+        path.write_bytes(content)
+        path.chmod(0o755)
+    
+    return install
@@ -0,0 +1,61 @@
+"""
+Helpers shared by the universal-ci test modules (fixtures live in conftest.py).
+"""
+
+import functools
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import pygit2
+except ImportError:  # Optional - fall back to the git CLI without it
+    pygit2 = None
+
+
+# Identity used for every commit made by the tests
+GIT_TEST_CONFIG = {"user.email": "test@test.com", "user.name": "Test User"}
+
+
+@functools.lru_cache(maxsize=None)
+def _which(program: str) -> str:
+    return shutil.which(program) or program
+
+
+def fast_run(cmd, **kw) -> subprocess.CompletedProcess:
+    """
+    subprocess.run that lets CPython use posix_spawn: the executable is given as
+    an absolute path and fds are inherited. (posix_spawn is still skipped when
+    cwd is passed, so tests that chdir first get the fast path.)
+    """
+    kw.setdefault("close_fds", False)
+    kw.setdefault("start_new_session", False)
+    return subprocess.run([_which(cmd[0]), *cmd[1:]], **kw)
+
+
+def git_env(config: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Environment for a single git invocation carrying the test identity plus any
+    extra config through GIT_CONFIG_COUNT/KEY_n/VALUE_n (git 2.31+), instead of
+    spawning `git config` to persist it in the repo.
+    """
+    settings = {**GIT_TEST_CONFIG, **(config or {})}
+    env = dict(os.environ, GIT_CONFIG_COUNT=str(len(settings)))
+    for index, (key, value) in enumerate(settings.items()):
+        env[f"GIT_CONFIG_KEY_{index}"] = key
+        env[f"GIT_CONFIG_VALUE_{index}"] = value
+    return env
+
+
+def init_git_repo(repo_path: Path) -> None:
+    """
+    Initialize an empty git repo: in-process with pygit2 when it's installed,
+    otherwise with a single git spawn. Commits get their identity from git_env().
+    """
+    if pygit2 is not None:
+        pygit2.init_repository(str(repo_path))
+        return
+    
+    fast_run(["git", "init", "-q", str(repo_path)], check=True, capture_output=True)
@@ -4,26 +4,94 @@ Simple test runner for git hooks blocking tests
 Runs tests without pytest to avoid dependency issues
 """
 
+import atexit
+import contextlib
+import io
+import multiprocessing
 import json
 import os
+import shutil
+import signal
 import tempfile
 import subprocess
 from pathlib import Path
 import sys
 
 
+def _git(cwd, *args: str) -> None:
+    """
+    Run a git command for its exit status only, raising CalledProcessError on failure.
+    Uses posix_spawn where available; cwd goes through `git -C` since
+    posix_spawn has no chdir action.
+    """
+    argv = ["git", "-C", str(cwd), *args]
+    if not hasattr(os, "posix_spawnp"):
+        subprocess.run(argv, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    
+    devnull = [(os.POSIX_SPAWN_OPEN, fd, os.devnull, os.O_WRONLY, 0) for fd in (1, 2)]
+    pid = os.posix_spawnp("git", argv, os.environ, file_actions=devnull,
+                          setsigdef=[signal.SIGPIPE])
+    _, status = os.waitpid(pid, 0)
+    # os.waitstatus_to_exitcode needs Python 3.9; decode the status by hand
+    if os.WIFEXITED(status):
+        returncode = os.WEXITSTATUS(status)
+    else:
+        returncode = -os.WTERMSIG(status)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, argv)
+
+
+# Template repo shared by every test in this process (and by pool workers)
+_template_dir = None
+
+
+def _git_template() -> Path:
+    """Create (once) an initialized and configured git repo to clone per test."""
+    global _template_dir
+    if _template_dir is None:
+        template_dir = tempfile.mkdtemp(prefix="universal-ci-git-template-")
+        atexit.register(shutil.rmtree, template_dir, ignore_errors=True)
+        
+        _git(template_dir, "init")
+        
+        # Append the user identity directly instead of spawning git config twice
+        with open(os.path.join(template_dir, ".git", "config"), "a") as f:
+            f.write("[user]\n\temail = test@test.com\n\tname = Test User\n")
+        _template_dir = Path(template_dir)
+    return _template_dir
+
+
+def _init_worker(template_dir: Path) -> None:
+    """Pool initializer: reuse the parent's template repo (workers skip atexit cleanup)."""
+    global _template_dir
+    _template_dir = template_dir
+
+
+def _clone_git_template(repo: Path) -> None:
+    """Clone the template repo into repo using hardlinks instead of byte copies."""
+    shutil.copytree(_git_template(), repo, copy_function=os.link, symlinks=True)
+
+
+def _write_exec(path: Path, content: str) -> None:
+    """Write an executable script, setting its mode on the open descriptor."""
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    try:
+        os.write(fd, content.encode())
+        os.fchmod(fd, 0o755)
+    finally:
+        os.close(fd)
+
+
 def test_pre_commit_hook_creation():
     """Test that pre-commit hook is created and executable."""
     print("\n🧪 Test: Pre-commit hook creation")
     
     with tempfile.TemporaryDirectory() as tmpdir:
         repo = Path(tmpdir) / "test_repo"
-        repo.mkdir()
         
-        # Initialize git repo
-        subprocess.run(["git", "init"], cwd=repo, capture_output=True, check=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=repo, check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo, check=True)
+        # Clone the pre-initialized git repo
+        _clone_git_template(repo)
         
         # Create pre-commit hook
         hooks_dir = repo / ".git" / "hooks"
@@ -34,8 +102,7 @@ def test_pre_commit_hook_creation():
 ./run-ci.sh
 exit $?
 """
-        pre_commit_hook.write_text(pre_commit_content)
-        pre_commit_hook.chmod(0o755)
+        _write_exec(pre_commit_hook, pre_commit_content)
         
         # Verify
         assert pre_commit_hook.exists(), "Hook file should exist"
@@ -51,12 +118,9 @@ def test_pre_push_hook_creation():
     
     with tempfile.TemporaryDirectory() as tmpdir:
         repo = Path(tmpdir) / "test_repo"
-        repo.mkdir()
         
-        # Initialize git repo
-        subprocess.run(["git", "init"], cwd=repo, capture_output=True, check=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=repo, check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo, check=True)
+        # Clone the pre-initialized git repo
+        _clone_git_template(repo)
         
         # Create pre-push hook
         hooks_dir = repo / ".git" / "hooks"
@@ -67,8 +131,7 @@ def test_pre_push_hook_creation():
 ./run-ci.sh --stage release
 exit $?
 """
-        pre_push_hook.write_text(pre_push_content)
-        pre_push_hook.chmod(0o755)
+        _write_exec(pre_push_hook, pre_push_content)
         
         # Verify
         assert pre_push_hook.exists(), "Hook file should exist"
@@ -84,12 +147,9 @@ def test_failing_task_blocks_commit():
     
     with tempfile.TemporaryDirectory() as tmpdir:
         repo = Path(tmpdir) / "test_repo"
-        repo.mkdir()
         
-        # Initialize git
-        subprocess.run(["git", "init"], cwd=repo, capture_output=True, check=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=repo, check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo, check=True)
+        # Clone the pre-initialized git repo
+        _clone_git_template(repo)
         
         # Create config with failing task
         config = {
@@ -107,39 +167,37 @@ def test_failing_task_blocks_commit():
         
         # Create dummy verify script that uses config
         verify_script = repo / "run-ci.sh"
-        verify_script.write_text("""#!/bin/sh
+        _write_exec(verify_script, """#!/bin/sh
 # Parse and execute the test task
 if grep -q '"command": "exit 1"' universal-ci.config.json; then
     exit 1
 fi
 exit 0
 """)
-        verify_script.chmod(0o755)
         
         # Create pre-commit hook
         hooks_dir = repo / ".git" / "hooks"
         hooks_dir.mkdir(parents=True, exist_ok=True)
         
         pre_commit = hooks_dir / "pre-commit"
-        pre_commit.write_text("""#!/bin/sh
+        _write_exec(pre_commit, """#!/bin/sh
 cd "$(git rev-parse --show-toplevel)"
 ./run-ci.sh --stage test
 exit $?
 """)
-        pre_commit.chmod(0o755)
         
         # Create a test file and stage it
         test_file = repo / "test.txt"
         test_file.write_text("test content")
         
-        subprocess.run(["git", "add", "test.txt"], cwd=repo, check=True, capture_output=True)
+        _git(repo, "add", "test.txt")
         
         # Attempt commit - should be blocked
         result = subprocess.run(
             ["git", "commit", "-m", "Test commit"],
             cwd=repo,
-            capture_output=True,
-            text=True
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
         )
         
         # Verify commit was blocked
@@ -154,12 +212,9 @@ def test_passing_task_allows_commit():
     
     with tempfile.TemporaryDirectory() as tmpdir:
         repo = Path(tmpdir) / "test_repo"
-        repo.mkdir()
         
-        # Initialize git
-        subprocess.run(["git", "init"], cwd=repo, capture_output=True, check=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=repo, check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo, check=True)
+        # Clone the pre-initialized git repo
+        _clone_git_template(repo)
         
         # Create config with passing task
         config = {
@@ -177,28 +232,26 @@ def test_passing_task_allows_commit():
         
         # Create dummy verify script
         verify_script = repo / "run-ci.sh"
-        verify_script.write_text("""#!/bin/sh
+        _write_exec(verify_script, """#!/bin/sh
 exit 0
 """)
-        verify_script.chmod(0o755)
         
         # Create pre-commit hook
         hooks_dir = repo / ".git" / "hooks"
         hooks_dir.mkdir(parents=True, exist_ok=True)
         
         pre_commit = hooks_dir / "pre-commit"
-        pre_commit.write_text("""#!/bin/sh
+        _write_exec(pre_commit, """#!/bin/sh
 cd "$(git rev-parse --show-toplevel)"
 ./run-ci.sh --stage test
 exit $?
 """)
-        pre_commit.chmod(0o755)
         
         # Create a test file and stage it
         test_file = repo / "test.txt"
         test_file.write_text("test content")
         
-        subprocess.run(["git", "add", "."], cwd=repo, check=True, capture_output=True)
+        _git(repo, "add", ".")
         
         # Attempt commit - should succeed
         result = subprocess.run(
@@ -220,12 +273,9 @@ def test_hook_called_on_commit():
     
     with tempfile.TemporaryDirectory() as tmpdir:
         repo = Path(tmpdir) / "test_repo"
-        repo.mkdir()
         
-        # Initialize git
-        subprocess.run(["git", "init"], cwd=repo, capture_output=True, check=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=repo, check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo, check=True)
+        # Clone the pre-initialized git repo
+        _clone_git_template(repo)
         
         # Create pre-commit hook that creates a marker file
         hooks_dir = repo / ".git" / "hooks"
@@ -233,23 +283,23 @@ def test_hook_called_on_commit():
         
         marker_file = repo / ".hook_was_called"
         pre_commit = hooks_dir / "pre-commit"
-        pre_commit.write_text(f"""#!/bin/sh
+        _write_exec(pre_commit, f"""#!/bin/sh
 touch {marker_file}
 exit 1
 """)
-        pre_commit.chmod(0o755)
         
         # Create a file to commit
         test_file = repo / "test.txt"
         test_file.write_text("content")
         
-        subprocess.run(["git", "add", "test.txt"], cwd=repo, check=True, capture_output=True)
+        _git(repo, "add", "test.txt")
         
         # Attempt commit
         subprocess.run(
             ["git", "commit", "-m", "test"],
             cwd=repo,
-            capture_output=True
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
         )
         
         # Verify hook was called (marker exists)
@@ -264,12 +314,9 @@ def test_multiple_failing_tasks():
     
     with tempfile.TemporaryDirectory() as tmpdir:
         repo = Path(tmpdir) / "test_repo"
-        repo.mkdir()
         
-        # Initialize git
-        subprocess.run(["git", "init"], cwd=repo, capture_output=True, check=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=repo, check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo, check=True)
+        # Clone the pre-initialized git repo
+        _clone_git_template(repo)
         
         # Create config with multiple tasks (one fails)
         config = {
@@ -299,36 +346,34 @@ def test_multiple_failing_tasks():
         
         # Create verify script that simulates running all tasks
         verify_script = repo / "run-ci.sh"
-        verify_script.write_text("""#!/bin/sh
+        _write_exec(verify_script, """#!/bin/sh
 # Simulate multiple tasks
 if grep -q '"command": "exit 1"' universal-ci.config.json; then
     exit 1
 fi
 exit 0
 """)
-        verify_script.chmod(0o755)
         
         # Create pre-commit hook
         hooks_dir = repo / ".git" / "hooks"
         hooks_dir.mkdir(parents=True, exist_ok=True)
         
         pre_commit = hooks_dir / "pre-commit"
-        pre_commit.write_text("""#!/bin/sh
+        _write_exec(pre_commit, """#!/bin/sh
 cd "$(git rev-parse --show-toplevel)"
 ./run-ci.sh --stage test
 exit $?
 """)
-        pre_commit.chmod(0o755)
         
         # Stage and attempt commit
         (repo / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], cwd=repo, check=True, capture_output=True)
+        _git(repo, "add", ".")
         
         result = subprocess.run(
             ["git", "commit", "-m", "Test"],
             cwd=repo,
-            capture_output=True,
-            text=True
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
         )
         
         # Should be blocked
@@ -337,6 +382,20 @@ exit $?
         return True
 
 
+def _run_one(test):
+    """Run a single (name, func) test, returning (name, passed, error, output)."""
+    test_name, test_func = test
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            test_func()
+            return test_name, True, None, output.getvalue()
+        except AssertionError as e:
+            return test_name, False, str(e), output.getvalue()
+        except Exception as e:
+            return test_name, False, f"Exception: {str(e)}", output.getvalue()
+
+
 def run_all_tests():
     """Run all tests and report results."""
     print("=" * 60)
@@ -353,15 +412,17 @@ def run_all_tests():
         ("Multiple failing tasks block", test_multiple_failing_tasks),
     ]
     
+    # Tests use isolated temp repos, so run them in parallel and print their
+    # buffered output in submission order
+    processes = min(len(tests), os.cpu_count() or 1)
+    with multiprocessing.Pool(processes, initializer=_init_worker,
+                              initargs=(_git_template(),)) as pool:
+        outcomes = pool.map(_run_one, tests)
+    
     results = []
-    for test_name, test_func in tests:
-        try:
-            passed = test_func()
-            results.append((test_name, True, None))
-        except AssertionError as e:
-            results.append((test_name, False, str(e)))
-        except Exception as e:
-            results.append((test_name, False, f"Exception: {str(e)}"))
+    for test_name, passed, error, output in outcomes:
+        print(output, end="")
+        results.append((test_name, passed, error))
     
     print("\n" + "=" * 60)
     print("📊 TEST RESULTS")
@@ -13,74 +13,116 @@ Strategy: RED -> GREEN -> Verify
 import pytest
 import json
 import os
+import shlex
 import tempfile
-import subprocess
 from pathlib import Path
 from typing import Tuple
 
+from helpers import init_git_repo, fast_run, git_env
+import verify
+from verify import install_hooks, Task
+
+
+# Hook scripts, as bytes so they're written without re-encoding per test
+RUN_CI_HOOK = b"""#!/bin/sh
+./run-ci.sh
+exit $?
+"""
+
+RUN_CI_RELEASE_HOOK = b"""#!/bin/sh
+./run-ci.sh --stage release
+exit $?
+"""
+
+PRE_COMMIT_HOOK = b"""#!/bin/sh
+cd "$(git rev-parse --show-toplevel)"
+./run-ci.sh --stage test
+exit $?
+"""
+
+FAILING_PRE_COMMIT_HOOK = b"""#!/bin/sh
+cd "$(git rev-parse --show-toplevel)"
+VERIFY_EXIT_CODE=1 ./run-ci.sh --stage test
+exit $?
+"""
+
+FAILING_PRE_PUSH_HOOK = b"""#!/bin/sh
+cd "$(git rev-parse --show-toplevel)"
+VERIFY_EXIT_CODE=1 ./run-ci.sh --stage release
+exit $?
+"""
+
+SECURITY_AUDIT_HOOK = b"""#!/bin/sh
+cd "$(git rev-parse --show-toplevel)"
+if ! ./run-ci.sh --stage test 2>&1 | grep -q "Security Audit"; then
+    # Task output should mention Security Audit
+    ./run-ci.sh --stage test 2>&1
+fi
+"""
+
+SECURITY_AUDIT_RUN_CI = """#!/bin/sh
+echo "🔍 Checking Security Audit..."
+echo "❌ Security Audit FAILED"
+exit 1
+""".encode()
+
+# Git runs hooks from the top of the work tree
+MARKER_HOOK = b"""#!/bin/sh
+touch .hook_was_called
+exit 1
+"""
+
+EXIT_42_HOOK = b"#!/bin/sh\nexit 42"
+
 
 class TestGitHooksSetup:
     """Unit tests for git hook creation and setup."""
     
-    def test_pre_commit_hook_creation(self, tmp_path, monkeypatch):
+    def test_pre_commit_hook_creation(self, class_tmp, request, monkeypatch, install_hook):
         """
         RED: Pre-commit hook should be created in .git/hooks/pre-commit
         GIVEN: A git repository is initialized
         WHEN: Universal CI hook setup is run
         THEN: A pre-commit hook should exist at .git/hooks/pre-commit
         """
-        repo = tmp_path / "test_repo"
+        repo = class_tmp / request.node.name
         repo.mkdir()
         monkeypatch.chdir(repo)
         
         # Initialize git repo
-        subprocess.run(["git", "init"], check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], check=True)
+        init_git_repo(repo)
         
         # Create pre-commit hook
         hooks_dir = repo / ".git" / "hooks"
         hooks_dir.mkdir(parents=True, exist_ok=True)
         
         pre_commit_hook = hooks_dir / "pre-commit"
-        pre_commit_content = """#!/bin/sh
-./run-ci.sh
-exit $?
-"""
-        pre_commit_hook.write_text(pre_commit_content)
-        pre_commit_hook.chmod(0o755)
+        install_hook(pre_commit_hook, RUN_CI_HOOK)
         
         # Verify hook exists and is executable
         assert pre_commit_hook.exists()
         assert os.access(pre_commit_hook, os.X_OK)
     
-    def test_pre_push_hook_creation(self, tmp_path, monkeypatch):
+    def test_pre_push_hook_creation(self, class_tmp, request, monkeypatch, install_hook):
         """
         RED: Pre-push hook should be created in .git/hooks/pre-push
         GIVEN: A git repository is initialized
         WHEN: Universal CI hook setup is run
         THEN: A pre-push hook should exist at .git/hooks/pre-push
         """
-        repo = tmp_path / "test_repo"
+        repo = class_tmp / request.node.name
         repo.mkdir()
         monkeypatch.chdir(repo)
         
         # Initialize git repo
-        subprocess.run(["git", "init"], check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], check=True)
+        init_git_repo(repo)
         
         # Create pre-push hook
         hooks_dir = repo / ".git" / "hooks"
         hooks_dir.mkdir(parents=True, exist_ok=True)
         
         pre_push_hook = hooks_dir / "pre-push"
-        pre_push_content = """#!/bin/sh
-./run-ci.sh --stage release
-exit $?
-"""
-        pre_push_hook.write_text(pre_push_content)
-        pre_push_hook.chmod(0o755)
+        install_hook(pre_push_hook, RUN_CI_RELEASE_HOOK)
         
         # Verify hook exists and is executable
         assert pre_push_hook.exists()
@@ -93,59 +135,30 @@ class TestScriptFailureBlocksBehavior:
     Uses TEST DRIVEN approach to validate blocking behavior.
     """
     
-    def _setup_git_repo(self, repo_path: Path, config: dict) -> None:
-        """Helper to setup a git repo with universal-ci config."""
-        repo_path.mkdir(parents=True, exist_ok=True)
-        
-        # Initialize git
-        subprocess.run(["git", "init"], cwd=repo_path, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], 
-                      cwd=repo_path, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], 
-                      cwd=repo_path, check=True, capture_output=True)
-        
-        # Write universal-ci config
+    def _write_config(self, repo_path: Path, config: dict) -> None:
+        """Helper to write the universal-ci config into a template repo copy."""
         config_file = repo_path / "universal-ci.config.json"
         config_file.write_text(json.dumps(config, indent=2))
-        
-        # Create dummy verify script
-        verify_script = repo_path / "run-ci.sh"
-        verify_script.write_text("""#!/bin/sh
-# Dummy verify script that can fail
-exit $VERIFY_EXIT_CODE
-""")
-        verify_script.chmod(0o755)
     
-    def _create_hooks(self, repo_path: Path) -> None:
+    def _create_hooks(self, repo_path: Path, install_hook) -> None:
         """Helper to create pre-commit and pre-push hooks."""
         hooks_dir = repo_path / ".git" / "hooks"
         hooks_dir.mkdir(parents=True, exist_ok=True)
         
         # Pre-commit hook
         pre_commit = hooks_dir / "pre-commit"
-        pre_commit.write_text("""#!/bin/sh
-cd "$(git rev-parse --show-toplevel)"
-VERIFY_EXIT_CODE=1 ./run-ci.sh --stage test
-exit $?
-""")
-        pre_commit.chmod(0o755)
+        install_hook(pre_commit, FAILING_PRE_COMMIT_HOOK)
         
         # Pre-push hook
         pre_push = hooks_dir / "pre-push"
-        pre_push.write_text("""#!/bin/sh
-cd "$(git rev-parse --show-toplevel)"
-VERIFY_EXIT_CODE=1 ./run-ci.sh --stage release
-exit $?
-""")
-        pre_push.chmod(0o755)
+        install_hook(pre_push, FAILING_PRE_PUSH_HOOK)
     
-    def test_failed_test_script_blocks_commit(self, tmp_path, monkeypatch):
+    def test_failed_test_script_blocks_commit(self, repo_path, monkeypatch, install_hook):
         """
         RED: When a test script fails, commit should be blocked
         SCENARIO: Pre-commit hook runs run-ci.sh with failing test stage
         EXPECTED: Commit should fail with non-zero exit code
         """
-        repo_path = tmp_path / "test_repo"
         config = {
             "tasks": [
                 {
@@ -157,33 +170,33 @@ exit $?
             ]
         }
         
-        self._setup_git_repo(repo_path, config)
-        self._create_hooks(repo_path)
+        self._write_config(repo_path, config)
+        self._create_hooks(repo_path, install_hook)
         monkeypatch.chdir(repo_path)
         
         # Create a test file and stage it
         test_file = repo_path / "test.txt"
         test_file.write_text("test content")
         
-        subprocess.run(["git", "add", "test.txt"], check=True, capture_output=True)
+        fast_run(["git", "add", "test.txt"], check=True, capture_output=True)
         
         # Attempt commit - should be blocked by hook
-        result = subprocess.run(
+        result = fast_run(
             ["git", "commit", "-m", "Test commit"],
             capture_output=True,
-            text=True
+            text=True,
+            env=git_env()
         )
         
         # Commit should fail (hook blocking)
         assert result.returncode != 0, "Commit should be blocked when test fails"
     
-    def test_passing_test_script_allows_commit(self, tmp_path, monkeypatch):
+    def test_passing_test_script_allows_commit(self, repo_path, monkeypatch, install_hook):
         """
         GREEN: When test script passes, commit should succeed
         SCENARIO: Pre-commit hook runs run-ci.sh with passing test stage
         EXPECTED: Commit should succeed with exit code 0
         """
-        repo_path = tmp_path / "test_repo"
         config = {
             "tasks": [
                 {
@@ -195,19 +208,14 @@ exit $?
             ]
         }
         
-        self._setup_git_repo(repo_path, config)
+        self._write_config(repo_path, config)
         
         # Create hook that passes
         hooks_dir = repo_path / ".git" / "hooks"
         hooks_dir.mkdir(parents=True, exist_ok=True)
         
         pre_commit = hooks_dir / "pre-commit"
-        pre_commit.write_text("""#!/bin/sh
-cd "$(git rev-parse --show-toplevel)"
-./run-ci.sh --stage test
-exit $?
-""")
-        pre_commit.chmod(0o755)
+        install_hook(pre_commit, PRE_COMMIT_HOOK)
         
         monkeypatch.chdir(repo_path)
         
@@ -215,26 +223,26 @@ exit $?
         test_file = repo_path / "test.txt"
         test_file.write_text("test content")
         
-        subprocess.run(["git", "add", "test.txt"], check=True, capture_output=True)
-        subprocess.run(["git", "add", "universal-ci.config.json"], check=True, capture_output=True)
+        fast_run(["git", "add", "test.txt"], check=True, capture_output=True)
+        fast_run(["git", "add", "universal-ci.config.json"], check=True, capture_output=True)
         
         # Attempt commit - should succeed
-        result = subprocess.run(
+        result = fast_run(
             ["git", "commit", "-m", "Test commit"],
             capture_output=True,
-            text=True
+            text=True,
+            env=git_env()
         )
         
         # Commit should succeed (hook passing)
         assert result.returncode == 0, f"Commit should succeed when tests pass. Output: {result.stderr}"
     
-    def test_multiple_failing_tasks_block_commit(self, tmp_path, monkeypatch):
+    def test_multiple_failing_tasks_block_commit(self, repo_path, monkeypatch, install_hook):
         """
         RED: Multiple failing tasks should all block commit
         SCENARIO: Config has 3 tasks, 2 pass, 1 fails
         EXPECTED: Overall verification fails, commit blocked
         """
-        repo_path = tmp_path / "test_repo"
         config = {
             "tasks": [
                 {
@@ -258,31 +266,31 @@ exit $?
             ]
         }
         
-        self._setup_git_repo(repo_path, config)
-        self._create_hooks(repo_path)
+        self._write_config(repo_path, config)
+        self._create_hooks(repo_path, install_hook)
         monkeypatch.chdir(repo_path)
         
         # Stage files
         (repo_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], check=True, capture_output=True)
+        fast_run(["git", "add", "."], check=True, capture_output=True)
         
         # Attempt commit - should fail due to failing task
-        result = subprocess.run(
+        result = fast_run(
             ["git", "commit", "-m", "Test with mixed results"],
             capture_output=True,
-            text=True
+            text=True,
+            env=git_env()
         )
         
         # Should fail because one task fails
         assert result.returncode != 0, "Commit should be blocked when any task fails"
     
-    def test_release_stage_blocks_push(self, tmp_path, monkeypatch):
+    def test_release_stage_blocks_push(self, repo_path, monkeypatch, install_hook):
         """
         RED: Failed release stage should block push operations
         SCENARIO: Pre-push hook runs run-ci.sh --stage release and it fails
         EXPECTED: Push should be blocked
         """
-        repo_path = tmp_path / "test_repo"
         config = {
             "tasks": [
                 {
@@ -294,20 +302,20 @@ exit $?
             ]
         }
         
-        self._setup_git_repo(repo_path, config)
-        self._create_hooks(repo_path)
+        self._write_config(repo_path, config)
+        self._create_hooks(repo_path, install_hook)
         monkeypatch.chdir(repo_path)
         
         # Initialize a commit
         (repo_path / "file.txt").write_text("content")
-        subprocess.run(["git", "add", "."], check=True, capture_output=True)
-        subprocess.run(["git", "config", "core.hooksPath", ".git/hooks"], check=True)
-        subprocess.run(["git", "commit", "-m", "Initial"], capture_output=True)
+        fast_run(["git", "add", "."], check=True, capture_output=True)
+        fast_run(["git", "commit", "-m", "Initial"], capture_output=True,
+                 env=git_env({"core.hooksPath": ".git/hooks"}))
         
         # Try to push - hook should block it
         # (We simulate the hook behavior rather than actual push)
         pre_push = repo_path / ".git" / "hooks" / "pre-push"
-        result = subprocess.run(
+        result = fast_run(
             ["bash", str(pre_push)],
             capture_output=True,
             text=True
@@ -322,13 +330,13 @@ class TestBlockingErrorMessages:
     Verify that blocked operations provide clear error messages about why they were blocked.
     """
     
-    def test_commit_block_shows_failing_task_name(self, tmp_path, monkeypatch):
+    def test_commit_block_shows_failing_task_name(self, class_tmp, request, monkeypatch, install_hook):
         """
         GIVEN: A commit is attempted with a failing task named 'Security Audit'
         WHEN: The pre-commit hook runs
         THEN: Error output should mention 'Security Audit' failed
         """
-        repo_path = tmp_path / "test_repo"
+        repo_path = class_tmp / request.node.name
         config = {
             "tasks": [
                 {
@@ -341,9 +349,7 @@ class TestBlockingErrorMessages:
         }
         
         repo_path.mkdir(parents=True, exist_ok=True)
-        subprocess.run(["git", "init"], cwd=repo_path, check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=repo_path, check=True)
-        subprocess.run(["git", "config", "user.name", "Test"], cwd=repo_path, check=True)
+        init_git_repo(repo_path)
         
         config_file = repo_path / "universal-ci.config.json"
         config_file.write_text(json.dumps(config, indent=2))
@@ -353,28 +359,17 @@ class TestBlockingErrorMessages:
         
         # Create hook that shows which task failed
         pre_commit = hooks_dir / "pre-commit"
-        pre_commit.write_text("""#!/bin/sh
-cd "$(git rev-parse --show-toplevel)"
-if ! ./run-ci.sh --stage test 2>&1 | grep -q "Security Audit"; then
-    # Task output should mention Security Audit
-    ./run-ci.sh --stage test 2>&1
-fi
-""")
-        pre_commit.chmod(0o755)
+        install_hook(pre_commit, SECURITY_AUDIT_HOOK)
         
         monkeypatch.chdir(repo_path)
         
         # Create dummy verify that mimics behavior
         verify = repo_path / "run-ci.sh"
-        verify.write_text("""#!/bin/sh
-echo "🔍 Checking Security Audit..."
-echo "❌ Security Audit FAILED"
-exit 1
-""")
+        verify.write_bytes(SECURITY_AUDIT_RUN_CI)
         verify.chmod(0o755)
         
         # Run hook and check output
-        result = subprocess.run(
+        result = fast_run(
             ["bash", str(pre_commit)],
             capture_output=True,
             text=True
@@ -387,36 +382,118 @@ exit 1
 class TestHookInstallation:
     """Tests for installing/setting up git hooks."""
     
-    def test_hook_installation_creates_correct_structure(self, tmp_path):
+    def test_hook_installation_creates_correct_structure(self, repo_path):
         """
         GIVEN: A project with universal-ci
-        WHEN: Hooks are installed via setup script
-        THEN: .git/hooks/ should contain pre-commit and pre-push
+        WHEN: Hooks are installed via install_hooks
+        THEN: .git/hooks/ should contain a hook only for stages with tasks
         """
-        repo_path = tmp_path / "project"
-        repo_path.mkdir()
-        
-        # Create hooks directory
         hooks_dir = repo_path / ".git" / "hooks"
-        hooks_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Install hooks
         pre_commit = hooks_dir / "pre-commit"
         pre_push = hooks_dir / "pre-push"
         
-        pre_commit.write_text("#!/bin/sh\nexit 0")
-        pre_commit.chmod(0o755)
-        
-        pre_push.write_text("#!/bin/sh\nexit 0")
-        pre_push.chmod(0o755)
+        # Only the test stage has tasks
+        install_hooks([Task("Lint", ".", "true")], str(hooks_dir))
         
-        # Verify structure
         assert pre_commit.exists()
-        assert pre_push.exists()
         assert os.access(pre_commit, os.X_OK)
+        assert not pre_push.exists()
+        
+        # Adding a release task installs pre-push as well
+        install_hooks([
+            Task("Lint", ".", "true"),
+            Task("Publish", ".", "true", stage="release"),
+        ], str(hooks_dir))
+        
+        assert pre_push.exists()
         assert os.access(pre_push, os.X_OK)
 
 
+    def test_hook_installation_keeps_foreign_hooks(self, repo_path):
+        """
+        GIVEN: A hook universal-ci didn't write, and a symlinked hook
+        WHEN: Hooks are installed
+        THEN: Both should be left alone, and neither link target touched
+        """
+        hooks_dir = repo_path / ".git" / "hooks"
+        hooks_dir.mkdir(parents=True, exist_ok=True)
+        pre_commit = hooks_dir / "pre-commit"
+        pre_commit.write_bytes(EXIT_42_HOOK)
+        tracked = repo_path / "tracked-hook.sh"
+        tracked.write_bytes(RUN_CI_HOOK)
+        (hooks_dir / "pre-push").symlink_to(tracked)
+        
+        installed = install_hooks([
+            Task("Lint", ".", "true"),
+            Task("Publish", ".", "true", stage="release"),
+        ], str(hooks_dir))
+        
+        assert installed == []
+        assert pre_commit.read_bytes() == EXIT_42_HOOK
+        assert tracked.read_bytes() == RUN_CI_HOOK
+    
+    def test_hook_installation_replaces_own_hook(self, repo_path):
+        """
+        GIVEN: A hook previously installed by universal-ci
+        WHEN: Hooks are installed again
+        THEN: The hook should be rewritten in place
+        """
+        hooks_dir = repo_path / ".git" / "hooks"
+        tasks = [Task("Lint", ".", "true")]
+        
+        install_hooks(tasks, str(hooks_dir))
+        installed = install_hooks(tasks, str(hooks_dir))
+        
+        assert installed == [str(hooks_dir / "pre-commit")]
+        assert not [name for name in os.listdir(hooks_dir) if name.startswith(".pre-commit-")]
+    
+    def test_hook_installation_quotes_verifier_path(self, repo_path, monkeypatch):
+        """
+        GIVEN: verify.py at a path containing shell metacharacters
+        WHEN: Hooks are installed
+        THEN: The hook should pass that exact path to python3
+        """
+        odd_path = str(repo_path / 'odd $HOME `x` "dir' / "verify.py")
+        monkeypatch.setattr(verify, "__file__", odd_path)
+        hooks_dir = repo_path / ".git" / "hooks"
+        
+        install_hooks([Task("Lint", ".", "true")], str(hooks_dir))
+        
+        exec_line = (hooks_dir / "pre-commit").read_text().splitlines()[-1]
+        assert shlex.split(exec_line) == ["exec", "python3", odd_path, "--stage", "test"]
+    
+    def test_hook_installation_in_linked_worktree(self, repo_path, tmp_path, monkeypatch):
+        """
+        GIVEN: A linked worktree, where .git is a file
+        WHEN: Hooks are installed from inside it without a hooks directory
+        THEN: The hook should land in the shared hooks directory of the main repo
+        """
+        fast_run(["git", "-C", str(repo_path), "commit", "-q", "--allow-empty", "-m", "Initial"],
+                 check=True, env=git_env())
+        worktree = tmp_path / "worktree"
+        fast_run(["git", "-C", str(repo_path), "worktree", "add", "-q", str(worktree)], check=True)
+        monkeypatch.chdir(worktree)
+        
+        installed = install_hooks([Task("Lint", ".", "true")])
+        
+        pre_commit = repo_path / ".git" / "hooks" / "pre-commit"
+        assert [os.path.realpath(path) for path in installed] == [os.path.realpath(pre_commit)]
+        assert os.access(pre_commit, os.X_OK)
+    
+    def test_hook_installation_honours_core_hooks_path(self, repo_path, monkeypatch):
+        """
+        GIVEN: A repository with core.hooksPath set
+        WHEN: Hooks are installed without a hooks directory
+        THEN: The hook should be written to the configured directory
+        """
+        fast_run(["git", "-C", str(repo_path), "config", "core.hooksPath", "custom-hooks"], check=True)
+        monkeypatch.chdir(repo_path)
+        
+        install_hooks([Task("Lint", ".", "true")])
+        
+        assert (repo_path / "custom-hooks" / "pre-commit").exists()
+
+
 class TestTrustButVerifyApproach:
     """
     Verify that hooks properly trust but verify git behavior.
@@ -425,19 +502,17 @@ class TestTrustButVerifyApproach:
     Verify: We verify that hooks are actually blocking operations
     """
     
-    def test_verify_hook_called_on_commit_attempt(self, tmp_path, monkeypatch):
+    def test_verify_hook_called_on_commit_attempt(self, class_tmp, request, monkeypatch, install_hook):
         """
         TRUST: Git will call our pre-commit hook
         VERIFY: We can detect that hook was called
         """
-        repo_path = tmp_path / "test_repo"
+        repo_path = class_tmp / request.node.name
         repo_path.mkdir()
         monkeypatch.chdir(repo_path)
         
         # Setup git repo
-        subprocess.run(["git", "init"], check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], check=True)
+        init_git_repo(repo_path)
         
         # Create a hook that creates a marker file
         hooks_dir = repo_path / ".git" / "hooks"
@@ -445,55 +520,50 @@ class TestTrustButVerifyApproach:
         
         marker_file = repo_path / ".hook_was_called"
         pre_commit = hooks_dir / "pre-commit"
-        pre_commit.write_text(f"""#!/bin/sh
-touch {marker_file}
-exit 1
-""")
-        pre_commit.chmod(0o755)
+        install_hook(pre_commit, MARKER_HOOK)
         
         # Create a file to commit
         (repo_path / "test.txt").write_text("content")
-        subprocess.run(["git", "add", "test.txt"], check=True, capture_output=True)
+        fast_run(["git", "add", "test.txt"], check=True, capture_output=True)
         
         # Attempt commit
-        subprocess.run(
+        fast_run(
             ["git", "commit", "-m", "test"],
-            capture_output=True
+            capture_output=True,
+            env=git_env()
         )
         
         # Verify hook was actually called (marker file exists)
         assert marker_file.exists(), "Hook should have been called"
     
-    def test_verify_exit_code_from_failing_hook(self, tmp_path, monkeypatch):
+    def test_verify_exit_code_from_failing_hook(self, class_tmp, request, monkeypatch, install_hook):
         """
         VERIFY: Exit code from failed hook propagates to git command
         """
-        repo_path = tmp_path / "test_repo"
+        repo_path = class_tmp / request.node.name
         repo_path.mkdir()
         monkeypatch.chdir(repo_path)
         
         # Setup git repo
-        subprocess.run(["git", "init"], check=True, capture_output=True)
-        subprocess.run(["git", "config", "user.email", "test@test.com"], check=True)
-        subprocess.run(["git", "config", "user.name", "Test User"], check=True)
+        init_git_repo(repo_path)
         
         # Create a failing hook
         hooks_dir = repo_path / ".git" / "hooks"
         hooks_dir.mkdir(parents=True, exist_ok=True)
         
         pre_commit = hooks_dir / "pre-commit"
-        pre_commit.write_text("#!/bin/sh\nexit 42")
-        pre_commit.chmod(0o755)
+        install_hook(pre_commit, EXIT_42_HOOK)
         
         # Create a file to commit
         (repo_path / "test.txt").write_text("content")
-        subprocess.run(["git", "add", "test.txt"], check=True, capture_output=True)
+        fast_run(["git", "add", "test.txt"], check=True, capture_output=True)
         
         # Attempt commit and capture exit code
-        result = subprocess.run(
+        result = fast_run(
             ["git", "commit", "-m", "test"],
             capture_output=True,
-            text=True
+            text=True,
+            env=git_env()
         )
         
         # Commit should fail (due to hook failure)
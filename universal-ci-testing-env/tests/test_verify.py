@@ -1,9 +1,16 @@
 import pytest
+import contextlib
+import io
 import json
 import os
+import subprocess
+import sys
 import tempfile
 from unittest.mock import patch, MagicMock
-from verify import load_config, run_task, Task, get_config_path
+from helpers import fast_run
+from verify import (load_config, run_task, run_task_captured, run_tasks_parallel,
+                    run_task_group, skip_missing_directories, dependency_stages,
+                    Task, get_config_path, GitSession)
 
 class TestConfigPathResolution:
     def test_config_in_current_directory(self, tmp_path, monkeypatch):
@@ -28,6 +35,65 @@ class TestConfigPathResolution:
         path = get_config_path(str(config_file))
         assert path == str(config_file)
 
+    def test_config_two_levels_up(self, tmp_path, monkeypatch):
+        config_file = tmp_path / "universal-ci.config.json"
+        config_file.write_text(json.dumps({"tasks": []}))
+        nested = tmp_path / "a" / "b"
+        nested.mkdir(parents=True)
+        monkeypatch.chdir(nested)
+        
+        path = get_config_path()
+        assert os.path.normpath(path) == os.path.join("..", "..", "universal-ci.config.json")
+        assert os.path.samefile(path, config_file)
+    
+    @patch('verify.GitSession.singleton')
+    def test_config_found_without_git(self, mock_singleton, tmp_path, monkeypatch):
+        (tmp_path / "universal-ci.config.json").write_text("{}")
+        nested = tmp_path / "a"
+        nested.mkdir()
+        monkeypatch.chdir(nested)
+        
+        assert os.path.normpath(get_config_path()) == os.path.join("..", "universal-ci.config.json")
+        mock_singleton.assert_not_called()
+
+class TestGitSession:
+    def test_toplevel_and_object_lookups(self, tmp_path):
+        fast_run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        blob = fast_run(["git", "hash-object", "-w", "--stdin"], cwd=tmp_path,
+                        input="content", capture_output=True, text=True, check=True).stdout.strip()
+        
+        session = GitSession(str(tmp_path))
+        try:
+            assert os.path.samefile(session.get_toplevel(), tmp_path)
+            assert session.object_info(blob) == (blob, "blob")
+            assert session.object_info("0" * 40) is None
+        finally:
+            session.close()
+    
+    def test_object_info_outside_repository(self, tmp_path, monkeypatch):
+        # Keep git from finding a repository above tmp_path
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+        session = GitSession(str(tmp_path))
+        try:
+            for _ in range(3):
+                assert session.object_info("HEAD") is None
+        finally:
+            session.close()
+    
+    def test_object_info_ambiguous(self, tmp_path):
+        session = GitSession(str(tmp_path))
+        session._cat_file = MagicMock()
+        session._cat_file.stdout.readline.return_value = "abcd ambiguous\n"
+        
+        assert session.object_info("abcd") is None
+    
+    @patch('subprocess.Popen', side_effect=FileNotFoundError("git"))
+    def test_object_info_without_git(self, mock_popen, tmp_path):
+        assert GitSession(str(tmp_path)).object_info("HEAD") is None
+    
+    def test_singleton_per_directory(self, tmp_path):
+        assert GitSession.singleton(str(tmp_path)) is GitSession.singleton(str(tmp_path))
+
 class TestLoadConfig:
     def test_load_valid_config(self):
         # Create a temporary config file
@@ -54,6 +120,43 @@ class TestLoadConfig:
         finally:
             os.unlink(config_path)
     
+    def test_load_config_depends_on(self, tmp_path):
+        config_data = {
+            "tasks": [
+                {"name": "Install", "working_directory": ".", "command": "true"},
+                {"name": "Test", "working_directory": ".", "command": "true", "depends_on": ["Install"]}
+            ]
+        }
+        config_file = tmp_path / "universal-ci.config.json"
+        config_file.write_text(json.dumps(config_data))
+        
+        tasks = load_config(str(config_file))
+        assert tasks[0].depends_on == ()
+        assert tasks[1].depends_on == ("Install",)
+    
+    def test_load_config_cached_until_modified(self, tmp_path):
+        config_file = tmp_path / "universal-ci.config.json"
+        config_file.write_text(json.dumps({"tasks": [{"name": "One", "working_directory": ".", "command": "true"}]}))
+        
+        first = load_config(str(config_file))
+        second = load_config(str(config_file))
+        assert first == second
+        assert first is not second
+        
+        stat = config_file.stat()
+        
+        # Rewritten within the same mtime tick, with a different size
+        config_file.write_text(json.dumps({"tasks": [{"name": "Three", "working_directory": ".", "command": "true"}]}))
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert [t.name for t in load_config(str(config_file))] == ["Three"]
+        
+        # Atomically replaced with a same-sized file and the same mtime
+        replacement = tmp_path / "replacement.json"
+        replacement.write_text(json.dumps({"tasks": [{"name": "Four!", "working_directory": ".", "command": "true"}]}))
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, config_file)
+        assert [t.name for t in load_config(str(config_file))] == ["Four!"]
+    
     def test_load_missing_config(self):
         with pytest.raises(SystemExit):
             load_config("nonexistent.json")
@@ -73,12 +176,27 @@ class TestRunTask:
     def test_run_task_failure(self, mock_run):
         mock_run.return_value.returncode = 1
         
-        task = Task("Fail Task", ".", "exit 1")
+        task = Task("Fail Task", ".", "false")
         result = run_task(task)
         
         assert result is False
         mock_run.assert_called_once()
     
+    @patch('subprocess.run')
+    def test_run_task_trivial_exit_skips_shell(self, mock_run):
+        assert run_task(Task("Pass Task", ".", "exit 0")) is True
+        assert run_task(Task("Fail Task", ".", "  exit 1 ")) is False
+        mock_run.assert_not_called()
+    
+    def test_run_task_with_redirected_stdout(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            result = run_task(Task("Echo Task", ".", "echo streamed; echo oops >&2"))
+        
+        assert result is True
+        assert "streamed\noops\n" in out.getvalue()
+        assert "Echo Task Passed" in out.getvalue()
+    
     @patch('os.path.exists')
     def test_run_task_missing_directory(self, mock_exists):
         mock_exists.return_value = False
@@ -89,6 +207,153 @@ class TestRunTask:
         assert result is True  # Should skip gracefully
         mock_exists.assert_called_once_with("nonexistent")
 
+    def test_skip_missing_directories(self, tmp_path, monkeypatch, capsys):
+        (tmp_path / "app" / "src").mkdir(parents=True)
+        monkeypatch.chdir(tmp_path)
+        tasks = [
+            Task("Root", ".", "true"),
+            Task("App", "./app/", "true"),
+            Task("Nested", "app/src", "true"),
+            Task("Missing", "missing", "true"),
+        ]
+        
+        survivors = skip_missing_directories(tasks)
+        
+        assert [task.name for task in survivors] == ["Root", "App", "Nested"]
+        assert "Skipped" in capsys.readouterr().out
+    
+    def test_file_working_directory_fails(self, tmp_path, monkeypatch):
+        (tmp_path / "notes.txt").write_text("not a directory")
+        monkeypatch.chdir(tmp_path)
+        
+        survivors = skip_missing_directories([Task("File", "notes.txt", "true")])
+        
+        assert [task.name for task in survivors] == ["File"]
+        assert run_task(survivors[0]) is False
+
+class TestParallelRun:
+    def test_dependency_stages_orders_by_depends_on(self):
+        install = Task("Install", ".", "true")
+        lint = Task("Lint", ".", "true")
+        test = Task("Test", ".", "true", depends_on=("Install",))
+        build = Task("Build", ".", "true", depends_on=("Test", "Missing"))
+        
+        stages = dependency_stages([install, lint, test, build])
+        
+        assert stages == [[install, lint], [test], [build]]
+    
+    def test_dependency_stages_cycle_runs_last(self):
+        a = Task("A", ".", "true", depends_on=("B",))
+        b = Task("B", ".", "true", depends_on=("A",))
+        
+        assert dependency_stages([a, b]) == [[a, b]]
+    
+    def test_run_task_captured_buffers_output(self):
+        task = Task("Echo Task", ".", "echo captured; echo oops >&2")
+        name, success, stdout, stderr = run_task_captured(task)
+        
+        assert name == "Echo Task"
+        assert success is True
+        assert "captured" in stdout
+        assert "Echo Task Passed" in stdout
+        assert "oops" in stderr
+    
+    def test_run_task_captured_undecodable_output(self):
+        name, success, stdout, stderr = run_task_captured(Task("Binary", ".", "printf '\\377\\n'"))
+        
+        assert success is True
+        assert "\ufffd" in stdout
+    
+    def test_run_tasks_parallel_reports_failures_in_order(self, capsys):
+        tasks = [
+            Task("First", ".", "exit 1"),
+            Task("Second", ".", "exit 0"),
+            Task("Third", ".", "exit 2"),
+        ]
+        
+        failures = run_tasks_parallel(tasks)
+        
+        assert failures == ["First", "Third"]
+        assert "Second Passed" in capsys.readouterr().out
+
+class TestGroupedRun:
+    def test_run_task_group_reports_each_task(self, capfd, tmp_path, monkeypatch):
+        (tmp_path / "marker").write_text("")
+        monkeypatch.chdir(tmp_path)
+        tasks = [
+            Task("First", ".", "echo one; exit 1"),
+            Task("Second", ".", "cd /; printf two"),
+            Task("Third", ".", "test -f marker"),
+        ]
+        
+        failures = run_task_group(tasks)
+        out = capfd.readouterr().out
+        
+        # Later tasks still run, from the original directory
+        assert failures == ["First"]
+        assert "one" in out
+        assert "two" in out
+        assert "Second Passed" in out
+        assert "Third Passed" in out
+    
+    def test_run_task_group_isolates_syntax_errors(self, capfd):
+        tasks = [
+            Task("Broken", ".", "echo 'unterminated"),
+            Task("Empty", ".", "   "),
+            Task("After", ".", "echo still-ran"),
+        ]
+        
+        failures = run_task_group(tasks)
+        out = capfd.readouterr().out
+        
+        assert failures == ["Broken"]
+        assert "still-ran" in out
+        assert "After Passed" in out
+    
+    def test_run_task_group_duplicate_names(self):
+        tasks = [Task("Test", ".", "false"), Task("Test", ".", "true")]
+        
+        assert run_task_group(tasks) == ["Test"]
+    
+    def test_grouped_output_keeps_stdout_and_stderr_in_order(self, tmp_path):
+        config = {"tasks": [
+            {"name": "First", "working_directory": ".", "command": "echo out-1; echo err-1 >&2"},
+            {"name": "Second", "working_directory": ".", "command": "echo err-2 >&2; echo out-2"},
+        ]}
+        (tmp_path / "universal-ci.config.json").write_text(json.dumps(config))
+        env = {k: v for k, v in os.environ.items() if k != "PYTHONUNBUFFERED"}
+        verify_script = os.path.join(os.path.dirname(__file__), "..", "verify.py")
+        
+        log = tmp_path / "log"
+        with open(log, "wb") as f:
+            subprocess.run([sys.executable, verify_script], cwd=tmp_path, env=env,
+                           stdout=f, stderr=subprocess.STDOUT)
+        out = log.read_text()
+        
+        markers = ["Starting Universal CI", "Checking First", "out-1", "err-1", "First Passed",
+                   "Checking Second", "err-2", "out-2", "Second Passed", "ALL SYSTEMS GO"]
+        positions = [out.index(marker) for marker in markers]
+        assert positions == sorted(positions)
+    
+    @patch('subprocess.Popen')
+    def test_run_task_group_trivial_exits_skip_shell(self, mock_popen):
+        tasks = [Task("Pass", ".", "exit 0"), Task("Fail", ".", "exit 3")]
+        
+        assert run_task_group(tasks) == ["Fail"]
+        mock_popen.assert_not_called()
+    
+    def test_run_task_group_mixed_trivial_exit(self, capfd):
+        tasks = [Task("Echo", ".", "echo hi"), Task("Fail", ".", "exit 2")]
+        
+        assert run_task_group(tasks) == ["Fail"]
+        assert "Echo Passed" in capfd.readouterr().out
+    
+    def test_run_task_group_missing_directory(self, capsys):
+        tasks = [Task("Missing", "does-not-exist", "true")]
+        
+        assert run_task_group(tasks) == []
+        assert "Skipped" in capsys.readouterr().out
+
 class TestIntegration:
     def test_full_verification_with_test_config(self):
         # This would require setting up a test environment
@@ -1,10 +1,23 @@
+import atexit
+import functools
 import json
 import subprocess
 import sys
 import os
-from dataclasses import dataclass
-from typing import List
+import re
+import shlex
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, NamedTuple, Optional, Tuple
 import argparse
+from pathlib import Path
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # Optional - fall back to the stdlib parser
+    _loads = json.loads
 
 # Colors for output
 GREEN = '\033[92m'
@@ -14,6 +27,19 @@ RESET = '\033[0m'
 
 CONFIG_FILE = "universal-ci.config.json"
 
+# Commands that only set an exit status; no need to start a shell for them
+_TRIVIAL_EXIT = re.compile(r'^\s*exit\s+(\d+)\s*$')
+
+# What `git cat-file --batch-check` reports for an object that exists
+_OBJECT_NAME = re.compile(r'^[0-9a-f]{40}([0-9a-f]{24})?$')
+_OBJECT_TYPES = {"blob", "tree", "commit", "tag"}
+
+# Git hook that runs each stage
+HOOK_STAGES = {"pre-commit": "test", "pre-push": "release"}
+
+# Marks hooks written by install_hooks, so they can be replaced but others can't
+HOOK_MARKER = "# Installed by universal-ci: verify.py --install-hooks"
+
 def get_config_path(provided_path: str = None) -> str:
     """
     Resolve config file path with multiple fallbacks:
@@ -25,41 +51,152 @@ def get_config_path(provided_path: str = None) -> str:
     if provided_path:
         return provided_path
     
-    # Check current directory first
-    if os.path.exists(CONFIG_FILE):
-        return CONFIG_FILE
-    
-    # Check parent directories (up to 3 levels for GitHub Actions)
-    for i in range(3):
-        parent_path = os.path.join("..", "*" * i, CONFIG_FILE)
-        normalized_path = os.path.normpath(parent_path)
-        if os.path.exists(normalized_path):
-            return normalized_path
+    # Resolution depends only on the working directory, so cache per cwd
+    return _resolve_config_path(os.getcwd())
+
+@functools.lru_cache(maxsize=None)
+def _resolve_config_path(cwd: str) -> str:
+    # Walk up from the current directory (up to 3 levels for GitHub Actions);
+    # only ask git for the repository root if that finds nothing
+    here = Path(cwd)
+    for depth, directory in enumerate([here, *list(here.parents)[:3]]):
+        if (directory / CONFIG_FILE).is_file():
+            return os.path.join(*([".."] * depth), CONFIG_FILE)
     
     # Check root of git repository
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0:
-            git_root = result.stdout.strip()
-            repo_config = os.path.join(git_root, CONFIG_FILE)
-            if os.path.exists(repo_config):
-                return repo_config
-    except Exception:
-        pass
+    git_root = _git_toplevel(cwd)
+    if git_root:
+        repo_config = os.path.join(git_root, CONFIG_FILE)
+        if os.path.exists(repo_config):
+            return repo_config
     
     # Default fallback
     return CONFIG_FILE
 
-@dataclass
-class Task:
+class GitSession:
+    """
+    Long-lived git helper for one working directory. Object lookups go through
+    a single `git cat-file --batch-check` process fed over stdin, and the
+    repository root is resolved once, so repeated queries skip git's startup.
+    """
+    _sessions = {}
+    _sessions_lock = threading.Lock()
+    
+    def __init__(self, cwd: str):
+        self.cwd = cwd
+        self._toplevel = None
+        self._hooks_dir = None
+        self._cat_file = None
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def singleton(cls, cwd: str = None) -> "GitSession":
+        """Return the shared session for cwd (default: current directory)."""
+        cwd = cwd or os.getcwd()
+        with cls._sessions_lock:
+            if cwd not in cls._sessions:
+                cls._sessions[cwd] = cls(cwd)
+            return cls._sessions[cwd]
+    
+    @classmethod
+    def close_all(cls) -> None:
+        with cls._sessions_lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions.clear()
+    
+    def _rev_parse(self, *args: str) -> str:
+        """Return `git rev-parse` output, or '' outside a git repository."""
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", *args],
+                cwd=self.cwd,
+                capture_output=True,
+                text=True
+            )
+            if result.returncode == 0:
+                return result.stdout.strip()
+        except Exception:
+            pass
+        return ""
+    
+    def get_toplevel(self) -> str:
+        """Return the repository root, or '' outside a git repository."""
+        if self._toplevel is None:
+            self._toplevel = self._rev_parse("--show-toplevel")
+        return self._toplevel
+    
+    def get_hooks_dir(self) -> str:
+        """
+        Return the absolute hooks directory, or '' outside a git repository.
+        Honours core.hooksPath and works in linked worktrees and submodules,
+        where .git is a file.
+        """
+        if self._hooks_dir is None:
+            hooks_dir = self._rev_parse("--git-path", "hooks")
+            self._hooks_dir = os.path.join(self.cwd, hooks_dir) if hooks_dir else ""
+        return self._hooks_dir
+    
+    def object_info(self, rev: str) -> Optional[Tuple[str, str]]:
+        """
+        Return (object name, object type) for rev, or None if it doesn't exist
+        or git can't answer (outside a repository, git not installed).
+        """
+        with self._lock:
+            try:
+                if self._cat_file is None:
+                    self._cat_file = subprocess.Popen(
+                        ["git", "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+                        cwd=self.cwd,
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        text=True,
+                        bufsize=1
+                    )
+                self._cat_file.stdin.write(rev + "\n")
+                self._cat_file.stdin.flush()
+                line = self._cat_file.stdout.readline().strip()
+            except OSError:
+                # Includes BrokenPipeError when cat-file has already exited
+                line = ""
+            
+            if not line and self._cat_file is not None and self._cat_file.poll() is not None:
+                # Dead process: drop it so the next call starts a fresh one
+                self._close_cat_file()
+        
+        # Anything but "<full hex name> <type>" (missing, ambiguous, ...) is no object
+        parts = line.split(" ")
+        if len(parts) != 2 or parts[1] not in _OBJECT_TYPES or not _OBJECT_NAME.match(parts[0]):
+            return None
+        return parts[0], parts[1]
+    
+    def _close_cat_file(self) -> None:
+        try:
+            self._cat_file.stdin.close()
+        except OSError:
+            pass
+        self._cat_file.stdout.close()
+        self._cat_file.wait()
+        self._cat_file = None
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._cat_file is not None:
+                self._close_cat_file()
+
+atexit.register(GitSession.close_all)
+
+def _git_toplevel(cwd: str) -> str:
+    """Return the git repository root for cwd, or '' outside a repository."""
+    return GitSession.singleton(cwd).get_toplevel()
+
+class Task(NamedTuple):
     name: str
     working_directory: str
     command: str
     stage: str = "test"  # 'test' or 'release'
+    depends_on: Tuple[str, ...] = ()  # names of tasks that must finish first (--parallel)
 
 def load_config(config_path: str = None, target_stage: str = "test") -> List[Task]:
     # Resolve the actual config path
@@ -70,9 +207,17 @@ def load_config(config_path: str = None, target_stage: str = "test") -> List[Tas
         print(f"Searched in: {CONFIG_FILE}, parent directories, and git root.")
         print(f"Please create {CONFIG_FILE} in the root directory.")
         sys.exit(1)
-        
-    with open(actual_path, 'r') as f:
-        data = json.load(f)
+    
+    # Re-parse only when the file changes; callers get their own list. Size and
+    # inode catch rewrites and atomic replaces within one mtime tick
+    st = os.stat(actual_path)
+    stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+    return list(_load_config_cached(os.path.abspath(actual_path), stamp, target_stage))
+
+@functools.lru_cache(maxsize=32)
+def _load_config_cached(path: str, stamp: Tuple[int, int, int], target_stage: str) -> Tuple[Task, ...]:
+    with open(path, 'rb') as f:
+        data = _loads(f.read())
         
     tasks = []
     for t in data.get("tasks", []):
@@ -85,48 +230,323 @@ def load_config(config_path: str = None, target_stage: str = "test") -> List[Tas
                 name=t["name"],
                 working_directory=t["working_directory"],
                 command=t["command"],
-                stage=task_stage
+                stage=task_stage,
+                depends_on=tuple(t.get("depends_on", ()))
             ))
-    return tasks
+    return tuple(tasks)
+
+def _trivial_exit_code(command: str) -> Optional[int]:
+    """Exit status of a bare `exit N` command, or None if it needs a shell."""
+    match = _TRIVIAL_EXIT.match(command)
+    return int(match.group(1)) & 0xFF if match else None
+
+def _task_header(task: Task) -> str:
+    return (f"---------------------------------------------------\n"
+            f"🔍 Checking {task.name}...\n"
+            f"   📂 Path: {task.working_directory}\n"
+            f"   🚀 Command: {task.command}\n")
+
+def _has_fileno(stream) -> bool:
+    try:
+        stream.fileno()
+        return True
+    except (AttributeError, OSError, ValueError):
+        return False
+
+def _stream_command(task: Task) -> int:
+    """
+    Run a task's command with stdout and stderr piped through this process,
+    for when sys.stdout has been replaced by something without a descriptor.
+    """
+    proc = subprocess.Popen(
+        task.command,
+        cwd=task.working_directory,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT
+    )
+    out = getattr(sys.stdout, "buffer", None)
+    if out is not None:
+        # Text already printed must come out before bytes written underneath it
+        sys.stdout.flush()
+    for line in iter(proc.stdout.readline, b""):
+        if out is not None:
+            out.write(line)
+        else:
+            sys.stdout.write(line.decode(errors="replace"))
+    proc.stdout.close()
+    return proc.wait()
 
 def run_task(task: Task) -> bool:
-    print(f"---------------------------------------------------")
-    print(f"🔍 Checking {task.name}...")
-    print(f"   📂 Path: {task.working_directory}")
-    print(f"   🚀 Command: {task.command}")
+    print(_task_header(task), end="")
     
     if not os.path.exists(task.working_directory):
         print(f"   {YELLOW}⚠️  Skipped (Directory not found){RESET}")
         return True
     
     # Run command
-    try:
-        # We need shell=True to handle && chaining
-        result = subprocess.run(
-            task.command, 
-            cwd=task.working_directory, 
-            shell=True, 
-            stdout=sys.stdout,
-            stderr=sys.stderr
-        )
-        
-        if result.returncode == 0:
-            print(f"   {GREEN}✅ {task.name} Passed{RESET}")
-            return True
-        else:
-            print(f"   {RED}❌ {task.name} FAILED{RESET}")
+    returncode = _trivial_exit_code(task.command)
+    if returncode is None:
+        try:
+            if not (_has_fileno(sys.stdout) and _has_fileno(sys.stderr)):
+                returncode = _stream_command(task)
+            else:
+                # The child writes straight to our descriptors, so flush the
+                # header first or it lands after the output on a pipe
+                sys.stdout.flush()
+                # We need shell=True to handle && chaining
+                result = subprocess.run(
+                    task.command, 
+                    cwd=task.working_directory, 
+                    shell=True, 
+                    stdout=sys.stdout,
+                    stderr=sys.stderr
+                )
+                returncode = result.returncode
+        except Exception as e:
+            print(f"   {RED}❌ Execution Error: {e}{RESET}")
             return False
-            
+    
+    if returncode == 0:
+        print(f"   {GREEN}✅ {task.name} Passed{RESET}")
+        return True
+    else:
+        print(f"   {RED}❌ {task.name} FAILED{RESET}")
+        return False
+
+def skip_missing_directories(tasks: List[Task]) -> List[Task]:
+    """
+    Report tasks whose working directory doesn't exist as skipped and return the
+    rest. One scandir of the current directory answers the common case of a
+    top-level directory without a stat; anything else (nested paths, other
+    spellings on case-insensitive filesystems) falls back to a stat. A path
+    that exists but isn't a directory is kept so its runner reports it failed.
+    """
+    with os.scandir(".") as it:
+        existing = {entry.name for entry in it if entry.is_dir()}
+    
+    survivors = []
+    for task in tasks:
+        path = os.path.normpath(task.working_directory)
+        if path in existing or os.path.exists(path):
+            survivors.append(task)
+        else:
+            print(_task_header(task), end="")
+            print(f"   {YELLOW}⚠️  Skipped (Directory not found){RESET}")
+    return survivors
+
+def _consecutive_groups(tasks: List[Task]) -> List[List[Task]]:
+    """Split tasks into runs of consecutive tasks sharing a working directory."""
+    groups = []
+    for task in tasks:
+        if groups and groups[-1][0].working_directory == task.working_directory:
+            groups[-1].append(task)
+        else:
+            groups.append([task])
+    return groups
+
+def run_task_group(tasks: List[Task]) -> List[str]:
+    """
+    Run tasks sharing a working directory in a single shell, returning the names
+    of failed tasks. Each command is eval'd in its own subshell so a failure,
+    `cd`, `exit` or syntax error doesn't affect the next one. The shell prints the headers and banners
+    itself, so tasks keep our stdout/stderr (and tty) and everything stays in
+    order; exit statuses come back through a separate status file.
+    """
+    working_directory = tasks[0].working_directory
+    if not os.path.exists(working_directory):
+        for task in tasks:
+            print(_task_header(task), end="")
+            print(f"   {YELLOW}⚠️  Skipped (Directory not found){RESET}")
+        return []
+    
+    trivial = [_trivial_exit_code(task.command) for task in tasks]
+    if None not in trivial or not (_has_fileno(sys.stdout) and _has_fileno(sys.stderr)):
+        return [task.name for task in tasks if not run_task(task)]
+    
+    fd, status_path = tempfile.mkstemp(prefix="universal-ci-status-")
+    os.close(fd)
+    status_file = shlex.quote(status_path)
+    
+    script = []
+    for index, (task, returncode) in enumerate(zip(tasks, trivial)):
+        passed = shlex.quote(f"   {GREEN}✅ {task.name} Passed{RESET}")
+        failed = shlex.quote(f"   {RED}❌ {task.name} FAILED{RESET}")
+        script.append(f"printf '%s' {shlex.quote(_task_header(task))}")
+        if returncode is None:
+            # eval keeps a syntax error (or an empty command) inside this
+            # task's subshell instead of breaking the whole script
+            script.append(f"( eval {shlex.quote(task.command)} )")
+            script.append("rc=$?")
+        else:
+            # Use the status directly rather than forking a subshell
+            script.append(f"rc={returncode}")
+        script.append(f'echo "{index}:$rc" >> {status_file}')
+        script.append(f"if [ \"$rc\" -eq 0 ]; then printf '%s\\n' {passed}; else printf '%s\\n' {failed}; fi")
+    
+    results = {}
+    try:
+        # The shell writes straight to our descriptors
+        sys.stdout.flush()
+        sys.stderr.flush()
+        subprocess.run("\n".join(script), cwd=working_directory, shell=True)
+        with open(status_path) as f:
+            for line in f:
+                index, rc = line.split(":")
+                results[int(index)] = int(rc) == 0
     except Exception as e:
         print(f"   {RED}❌ Execution Error: {e}{RESET}")
+    finally:
+        os.unlink(status_path)
+    
+    # Tasks without a recorded status never finished. Keyed by position, since
+    # task names needn't be unique
+    return [task.name for index, task in enumerate(tasks) if not results.get(index, False)]
+
+def run_task_captured(task: Task) -> Tuple[str, bool, str, str]:
+    """
+    Like run_task, but buffers everything instead of writing to the terminal so
+    tasks running in parallel don't interleave their output.
+    Returns (task name, success, stdout, stderr).
+    """
+    output = _task_header(task)
+    
+    if not os.path.exists(task.working_directory):
+        output += f"   {YELLOW}⚠️  Skipped (Directory not found){RESET}\n"
+        return task.name, True, output, ""
+    
+    returncode = _trivial_exit_code(task.command)
+    stderr = ""
+    if returncode is None:
+        try:
+            result = subprocess.run(
+                task.command,
+                cwd=task.working_directory,
+                shell=True,
+                capture_output=True,
+                text=True,
+                errors="replace"
+            )
+        except Exception as e:
+            output += f"   {RED}❌ Execution Error: {e}{RESET}\n"
+            return task.name, False, output, ""
+        output += result.stdout
+        stderr = result.stderr
+        returncode = result.returncode
+    
+    success = returncode == 0
+    if success:
+        output += f"   {GREEN}✅ {task.name} Passed{RESET}\n"
+    else:
+        output += f"   {RED}❌ {task.name} FAILED{RESET}\n"
+    return task.name, success, output, stderr
+
+def dependency_stages(tasks: List[Task]) -> List[List[Task]]:
+    """
+    Group tasks into stages that can each run in parallel: a task lands in the
+    first stage after all of its depends_on tasks. Dependencies on tasks outside
+    this list are ignored; tasks caught in a cycle run together in a final stage.
+    """
+    names = {task.name for task in tasks}
+    done = set()
+    remaining = list(tasks)
+    stages = []
+    
+    while remaining:
+        ready = [t for t in remaining if all(d in done or d not in names for d in t.depends_on)]
+        if not ready:
+            stages.append(remaining)
+            break
+        stages.append(ready)
+        done.update(t.name for t in ready)
+        remaining = [t for t in remaining if t not in ready]
+    
+    return stages
+
+def run_tasks_parallel(tasks: List[Task]) -> List[str]:
+    """Run tasks concurrently stage by stage, returning the names of failed tasks."""
+    failures = []
+    max_workers = max(1, (os.cpu_count() or 1) - 2)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for stage in dependency_stages(tasks):
+            futures = [executor.submit(run_task_captured, task) for task in stage]
+            for future in as_completed(futures):
+                name, success, stdout, stderr = future.result()
+                # Print each task's buffered output in one piece
+                sys.stdout.write(stdout)
+                sys.stdout.flush()
+                if stderr:
+                    sys.stderr.write(stderr)
+                    sys.stderr.flush()
+                if not success:
+                    failures.append(name)
+    
+    # Report failures in config order regardless of completion order
+    order = {task.name: i for i, task in enumerate(tasks)}
+    return sorted(failures, key=order.get)
+
+def install_hooks(tasks: List[Task], hooks_dir: str = None) -> List[str]:
+    """
+    Write git hooks for the stages that have at least one task, returning the
+    installed paths. Stages without tasks get no hook, so git doesn't start a
+    verifier just to find nothing to run. A hook that universal-ci didn't write
+    is left alone with a warning.
+    """
+    if hooks_dir is None:
+        hooks_dir = GitSession.singleton().get_hooks_dir()
+        if not hooks_dir:
+            print(f"{RED}Error: Not inside a git repository; can't install hooks.{RESET}")
+            sys.exit(1)
+    os.makedirs(hooks_dir, exist_ok=True)
+    
+    stages = {task.stage for task in tasks}
+    verifier = os.path.abspath(__file__)
+    installed = []
+    for hook, stage in HOOK_STAGES.items():
+        if stage not in stages:
+            continue
+        path = os.path.join(hooks_dir, hook)
+        if os.path.lexists(path) and not _is_own_hook(path):
+            print(f"   {YELLOW}⚠️  Keeping existing {path}; remove it to install the universal-ci hook{RESET}")
+            continue
+        
+        # Write a temp file and rename it over the hook, so a symlinked hook is
+        # replaced rather than written through to its target
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{hook}-", dir=hooks_dir)
+        with os.fdopen(fd, "w") as f:
+            f.write(f"#!/bin/sh\n{HOOK_MARKER}\n"
+                    f"exec python3 {shlex.quote(verifier)} --stage {stage}\n")
+        os.chmod(tmp_path, 0o755)
+        os.replace(tmp_path, path)
+        installed.append(path)
+    return installed
+
+def _is_own_hook(path: str) -> bool:
+    """Whether path is a regular-file hook previously written by install_hooks."""
+    if os.path.islink(path):
+        return False
+    try:
+        with open(path) as f:
+            return HOOK_MARKER in f.read()
+    except (OSError, UnicodeDecodeError):
         return False
 
 def main():
     parser = argparse.ArgumentParser(description='Universal CI Verifier')
     parser.add_argument('--config', default=CONFIG_FILE, help='Path to config file')
     parser.add_argument('--stage', default='test', choices=['test', 'release'], help='Stage to execute (test or release)')
+    parser.add_argument('--parallel', action='store_true', help='Run tasks concurrently, ordered only by depends_on')
+    parser.add_argument('--serial', action='store_true', help='Run each task in its own shell (for debugging)')
+    parser.add_argument('--install-hooks', action='store_true', help='Install git hooks for stages that have tasks')
     args = parser.parse_args()
     
+    if args.install_hooks:
+        tasks = load_config(args.config, "test") + load_config(args.config, "release")
+        for path in install_hooks(tasks):
+            print(f"   {GREEN}✅ Installed {path}{RESET}")
+        sys.exit(0)
+    
     print("🌐 Starting Universal CI Verification (Config-Driven)...")
     
     # Determine environment
@@ -145,10 +565,19 @@ def main():
         print(f"   {YELLOW}No tasks found for stage: {args.stage}{RESET}")
         sys.exit(0)
     
-    for task in tasks:
-        success = run_task(task)
-        if not success:
-            failures.append(task.name)
+    tasks = skip_missing_directories(tasks)
+    
+    if args.parallel:
+        failures = run_tasks_parallel(tasks)
+    elif args.serial:
+        for task in tasks:
+            success = run_task(task)
+            if not success:
+                failures.append(task.name)
+    else:
+        # One shell per run of tasks sharing a working directory
+        for group in _consecutive_groups(tasks):
+            failures.extend(run_task_group(group))
 
     print("---------------------------------------------------")
     print("📊 SUMMARY")